@@ -1,3 +1,12 @@
-from .agent import create_agent, run_agent
+# agent.agent pulls in anthropic and LangChain, so it is imported on first
+# attribute access rather than whenever a submodule like agent.tools is used.
 
 __all__ = ["create_agent", "run_agent"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from . import agent
+
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,49 +10,22 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from agent.tools.schema import introspect_schema
 from agent.tools.query import execute_query
+from agent.tools.profile import profile_table
+from agent.streaming import TextBuffer, ToolResultStore
+from db.catalog import get_catalog
+from tracing import span, start_span, SPAN_KIND_CLIENT
 
 load_dotenv()
 
-# System prompt for the BrowserBase data warehouse assistant
-SYSTEM_PROMPT = """You are a helpful data analyst assistant for BasedHoc, a reporting portal for BrowserBase operational data stored in a MotherDuck (DuckDB) warehouse.
+# System prompt for the BrowserBase data warehouse assistant.
+# {table_catalog} is filled from the schema catalog by get_system_prompt().
+SYSTEM_PROMPT_TEMPLATE = """You are a helpful data analyst assistant for BasedHoc, a reporting portal for BrowserBase operational data stored in a MotherDuck (DuckDB) warehouse.
 
 ## Data Warehouse Architecture
 
 The warehouse follows a **medallion architecture** with these schemas:
 
-### Bronze Layer (Raw Data) — `bronze_supabase`
-Raw tables ingested from Supabase:
-- `api_keys`, `browser_sessions`, `invoices`, `organizations`, `plans`, `projects`
-- `session_events`, `subscriptions`, `usage_records`, `users`
-
-### Silver Layer (Cleaned/Staged) — `silver_core`
-Cleaned dimensions and facts:
-- `dim_org` — Organization dimension
-- `dim_user` — User dimension
-- `core_sessions` — Cleaned browser sessions
-- `fct_browser_run` — Browser run facts
-- `fct_event` — Session event facts
-- `fct_subscription` — Subscription facts
-
-### Gold Layer (Marts) — `gold_marts`
-Pre-aggregated team fact tables:
-- `fct_daily_sessions` — Daily session counts
-- `fct_monthly_revenue` — Monthly revenue aggregations
-- `fct_engineering_daily` — Engineering team daily metrics
-- `fct_growth_daily` — Growth team daily metrics
-- `fct_ops_daily` — Operations team daily metrics
-- `fct_product_daily` — Product team daily metrics
-
-### Gold Layer (KPI Views) — `gold_metrics`
-Ready-to-query KPI views:
-- `v_daily_kpis` — Daily KPI summary
-- `v_mrr` — Monthly recurring revenue
-- `v_cohort_retention` — Cohort retention analysis
-- `v_active_organizations` — Active org metrics
-- `v_growth_kpis` — Growth team KPIs
-- `v_engineering_kpis` — Engineering team KPIs
-- `v_ops_kpis` — Operations team KPIs
-- `v_product_kpis` — Product team KPIs
+{table_catalog}
 
 ## SQL Dialect
 - This is **DuckDB** (via MotherDuck), not SQLite or Postgres.
@@ -60,14 +33,16 @@ Ready-to-query KPI views:
 - DuckDB supports modern SQL: `DATE_TRUNC`, `INTERVAL`, window functions, CTEs, `QUALIFY`, list/struct types, etc.
 
 ## Tools
-- **introspect_schema**: Discover all tables and columns across the warehouse schemas
+- **introspect_schema**: Look up tables and columns; filter by `schema_name`, `table_pattern` or `topic` to keep results small
+- **profile_table**: Cached row count, column min/max, null fraction, top values and sample rows for a table
 - **execute_query**: Run read-only SQL queries (SELECT only)
 
 ## Guidelines
 - **Start with gold_metrics views** for KPI questions — they have pre-computed metrics.
 - Use gold_marts fact tables for aggregated analysis.
 - Drop to silver_core or bronze_supabase only when detailed/raw data is needed.
-- When users ask about data structure, use introspect_schema first.
+- When users ask about data structure, use introspect_schema first — pass a filter rather than fetching every table.
+- Check value ranges and categorical values with profile_table instead of running DISTINCT/MIN/MAX probe queries.
 - If a query fails, explain why and suggest alternatives.
 - Be concise but thorough in explanations.
 
@@ -79,10 +54,16 @@ Ready-to-query KPI views:
 """
 
 
+def get_system_prompt() -> str:
+    """Build the system prompt with the table list generated from the schema catalog."""
+    return SYSTEM_PROMPT_TEMPLATE.format(table_catalog=get_catalog().render_table_list())
+
+
 def get_tools() -> list:
     """Get all available tools."""
     return [
         introspect_schema,
+        profile_table,
         execute_query,
     ]
 
@@ -103,7 +84,7 @@ def create_agent():
 
 def convert_messages(history: list[dict]) -> list:
     """Convert message history to LangChain message format."""
-    messages = [SystemMessage(content=SYSTEM_PROMPT)]
+    messages = [SystemMessage(content=get_system_prompt())]
 
     for msg in history:
         role = msg.get("role", "user")
@@ -117,6 +98,20 @@ def convert_messages(history: list[dict]) -> list:
     return messages
 
 
+async def _invoke_model(agent, messages: list, turn: int):
+    """Call the model once inside a client span, recording token usage."""
+    with span("anthropic.messages.create", kind=SPAN_KIND_CLIENT, attributes={
+        "gen_ai.request.model": "claude-sonnet-4-20250514",
+        "agent.turn": turn,
+    }) as model_span:
+        response = await agent.ainvoke(messages)
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            model_span.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens"))
+            model_span.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens"))
+        return response
+
+
 async def run_agent(
     message: str,
     history: list[dict] | None = None,
@@ -138,7 +133,8 @@ async def run_agent(
     messages.append(HumanMessage(content=message))
 
     # Run initial response
-    response = await agent.ainvoke(messages)
+    turn = 0
+    response = await _invoke_model(agent, messages, turn)
 
     tool_calls = []
     tool_results = []
@@ -159,7 +155,8 @@ async def run_agent(
             # Execute the tool
             tool = tools.get(tool_name)
             if tool:
-                result = tool.invoke(tool_args)
+                with span(f"tool.{tool_name}", attributes={"tool.name": tool_name}):
+                    result = tool.invoke(tool_args)
                 tool_results.append({
                     "tool": tool_name,
                     "result": result,
@@ -173,7 +170,8 @@ async def run_agent(
                 ))
 
         # Get next response
-        response = await agent.ainvoke(messages)
+        turn += 1
+        response = await _invoke_model(agent, messages, turn)
 
     return {
         "response": response.content,
@@ -205,13 +203,32 @@ async def run_agent_streaming(
     Yields SSE events:
     - {"type": "thinking", "content": "..."} - Thinking content
     - {"type": "tool_call", "name": "...", "args": {...}} - Tool being called
-    - {"type": "tool_result", "name": "...", "result": {...}} - Tool result
+    - {"type": "tool_result", "tool": "...", "result": {...}, "result_ref": "..."} - Tool result
     - {"type": "text", "content": "..."} - Response text chunk
-    - {"type": "done", "tool_calls": [...], "tool_results": [...]} - Final event
+    - {"type": "done", "tool_calls": [...], "tool_results": [{"tool": "...", "result_ref": "..."}],
+       "trace_id": "..."} - Final event; results are referenced, not repeated
     """
+    agent_span = start_span("agent.run_streaming", attributes={"agent.history_length": len(history or [])})
+    try:
+        async for event in _run_agent_streaming(message, history, agent_span):
+            yield event
+    except BaseException as e:
+        agent_span.record_exit(e)
+        raise
+    finally:
+        agent_span.end()
+
+
+async def _run_agent_streaming(
+    message: str,
+    history: list[dict] | None,
+    agent_span,
+) -> AsyncGenerator[dict, None]:
+    """Agentic streaming loop for run_agent_streaming, traced under agent_span."""
     client = anthropic.Anthropic()
     tools_map = {tool.name: tool for tool in get_tools()}
     tools_schema = get_tools_schema()
+    system_prompt = get_system_prompt()
 
     # Build messages
     messages = []
@@ -222,63 +239,93 @@ async def run_agent_streaming(
     messages.append({"role": "user", "content": message})
 
     all_tool_calls = []
-    all_tool_results = []
+    # Each result is serialized once; the same string is sent back to the model
+    tool_results = ToolResultStore()
 
     # Agentic loop with streaming
+    turn = 0
     while True:
         # Stream response with extended thinking
-        thinking_content = ""
+        thinking_content = TextBuffer()
         thinking_signature = ""
-        text_content = ""
+        text_content = TextBuffer()
         current_tool_calls = []
 
-        with client.messages.stream(
-            model="claude-sonnet-4-20250514",
-            max_tokens=16000,
-            thinking={
-                "type": "enabled",
-                "budget_tokens": 10000,
-            },
-            system=SYSTEM_PROMPT,
-            tools=tools_schema,
-            messages=messages,
-        ) as stream:
-            for event in stream:
-                # Handle different event types
-                if event.type == "content_block_start":
-                    if hasattr(event, 'content_block'):
-                        block = event.content_block
-                        if block.type == "thinking":
-                            thinking_content = ""
-                        elif block.type == "tool_use":
-                            current_tool_calls.append({
-                                "id": block.id,
-                                "name": block.name,
-                                "args_json": "",
-                            })
-                            yield {"type": "tool_start", "name": block.name}
-
-                elif event.type == "content_block_delta":
-                    if hasattr(event, 'delta'):
-                        delta = event.delta
-                        if delta.type == "thinking_delta":
-                            thinking_content += delta.thinking
-                            yield {"type": "thinking", "content": delta.thinking}
-                        elif delta.type == "text_delta":
-                            text_content += delta.text
-                            yield {"type": "text", "content": delta.text}
-                        elif delta.type == "input_json_delta":
-                            if current_tool_calls:
-                                current_tool_calls[-1]["args_json"] += delta.partial_json
-
-                elif event.type == "content_block_stop":
-                    pass
-
-            # Get the final message to extract thinking signature
-            final_message = stream.get_final_message()
-            for block in final_message.content:
-                if block.type == "thinking":
-                    thinking_signature = block.signature
+        # Kept off the context var: this span stays open across yields
+        model_span = start_span("anthropic.messages.stream", parent=agent_span, kind=SPAN_KIND_CLIENT, attributes={
+            "gen_ai.request.model": "claude-sonnet-4-20250514",
+            "agent.turn": turn,
+        })
+        first_token_ms = None
+        thinking_started_ms = None
+        thinking_ms = 0.0
+        turn += 1
+
+        try:
+            with client.messages.stream(
+                model="claude-sonnet-4-20250514",
+                max_tokens=16000,
+                thinking={
+                    "type": "enabled",
+                    "budget_tokens": 10000,
+                },
+                system=system_prompt,
+                tools=tools_schema,
+                messages=messages,
+            ) as stream:
+                for event in stream:
+                    # Handle different event types
+                    if event.type == "content_block_start":
+                        if hasattr(event, 'content_block'):
+                            block = event.content_block
+                            if block.type == "thinking":
+                                thinking_content = TextBuffer()
+                                thinking_started_ms = model_span.elapsed_ms()
+                            elif block.type == "tool_use":
+                                current_tool_calls.append({
+                                    "id": block.id,
+                                    "name": block.name,
+                                    "args_json": TextBuffer(),
+                                })
+                                yield {"type": "tool_start", "name": block.name}
+
+                    elif event.type == "content_block_delta":
+                        if first_token_ms is None:
+                            first_token_ms = model_span.elapsed_ms()
+                            model_span.set_attribute("gen_ai.ttft_ms", round(first_token_ms, 1))
+                            model_span.add_event("first_token")
+                        if hasattr(event, 'delta'):
+                            delta = event.delta
+                            if delta.type == "thinking_delta":
+                                thinking_content.append(delta.thinking)
+                                yield {"type": "thinking", "content": delta.thinking}
+                            elif delta.type == "text_delta":
+                                text_content.append(delta.text)
+                                yield {"type": "text", "content": delta.text}
+                            elif delta.type == "input_json_delta":
+                                if current_tool_calls:
+                                    current_tool_calls[-1]["args_json"].append(delta.partial_json)
+
+                    elif event.type == "content_block_stop":
+                        if thinking_started_ms is not None:
+                            thinking_ms += model_span.elapsed_ms() - thinking_started_ms
+                            thinking_started_ms = None
+
+                # Get the final message to extract thinking signature
+                final_message = stream.get_final_message()
+                for block in final_message.content:
+                    if block.type == "thinking":
+                        thinking_signature = block.signature
+
+            model_span.set_attribute("gen_ai.thinking_ms", round(thinking_ms, 1))
+            model_span.set_attribute("gen_ai.usage.input_tokens", final_message.usage.input_tokens)
+            model_span.set_attribute("gen_ai.usage.output_tokens", final_message.usage.output_tokens)
+            model_span.set_attribute("gen_ai.response.stop_reason", final_message.stop_reason)
+        except BaseException as e:
+            model_span.record_exit(e)
+            raise
+        finally:
+            model_span.end()
 
         # Process tool calls if any
         if current_tool_calls:
@@ -286,7 +333,7 @@ async def run_agent_streaming(
             tool_use_blocks = []
             for tc in current_tool_calls:
                 try:
-                    args = json.loads(tc["args_json"]) if tc["args_json"] else {}
+                    args = json.loads(tc["args_json"].getvalue()) if tc["args_json"] else {}
                 except json.JSONDecodeError:
                     args = {}
 
@@ -296,17 +343,21 @@ async def run_agent_streaming(
                 yield {"type": "tool_call", "name": tc["name"], "args": args}
 
                 # Execute tool
-                tool = tools_map.get(tc["name"])
-                if tool:
-                    try:
-                        result = tool.invoke(args)
-                    except Exception as e:
-                        result = {"error": str(e)}
-                else:
-                    result = {"error": f"Unknown tool: {tc['name']}"}
-
-                all_tool_results.append({"tool": tc["name"], "result": result})
-                yield {"type": "tool_result", "tool": tc["name"], "result": result}
+                with span(f"tool.{tc['name']}", parent=agent_span, attributes={"tool.name": tc["name"]}) as tool_span:
+                    tool = tools_map.get(tc["name"])
+                    if tool:
+                        try:
+                            result = tool.invoke(args)
+                        except Exception as e:
+                            tool_span.record_exception(e)
+                            result = {"error": str(e)}
+                    else:
+                        result = {"error": f"Unknown tool: {tc['name']}"}
+
+                tc["result_ref"] = tool_results.put(tc["name"], result)
+                yield {"type": "tool_result", "tool": tc["name"], "result": result, "result_ref": tc["result_ref"]}
+                # The store holds the only long-lived copy
+                del result
 
                 tool_use_blocks.append({
                     "type": "tool_use",
@@ -320,22 +371,22 @@ async def run_agent_streaming(
             if thinking_content and thinking_signature:
                 assistant_content.append({
                     "type": "thinking",
-                    "thinking": thinking_content,
+                    "thinking": thinking_content.getvalue(),
                     "signature": thinking_signature,
                 })
             if text_content:
-                assistant_content.append({"type": "text", "text": text_content})
+                assistant_content.append({"type": "text", "text": text_content.getvalue()})
             assistant_content.extend(tool_use_blocks)
 
             messages.append({"role": "assistant", "content": assistant_content})
 
             # Add tool results
             tool_result_content = []
-            for i, tc in enumerate(current_tool_calls):
+            for tc in current_tool_calls:
                 tool_result_content.append({
                     "type": "tool_result",
                     "tool_use_id": tc["id"],
-                    "content": json.dumps(all_tool_results[-(len(current_tool_calls)-i)]["result"]),
+                    "content": tool_results.get_json(tc["result_ref"]),
                 })
             messages.append({"role": "user", "content": tool_result_content})
 
@@ -343,11 +394,16 @@ async def run_agent_streaming(
             # No more tool calls, we're done
             break
 
+    agent_span.set_attribute("agent.turns", turn)
+    agent_span.set_attribute("agent.tool_calls", len(all_tool_calls))
+    agent_span.set_attribute("agent.tool_result_chars", tool_results.nbytes())
+
     yield {
         "type": "done",
-        "content": text_content,
+        "content": text_content.getvalue(),
         "tool_calls": all_tool_calls if all_tool_calls else None,
-        "tool_results": all_tool_results if all_tool_results else None,
+        "tool_results": tool_results.refs() if tool_results else None,
+        "trace_id": agent_span.trace_id,
     }
 
 
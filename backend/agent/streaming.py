@@ -0,0 +1,70 @@
+"""Bounded-memory helpers for accumulating streamed agent output."""
+
+import json
+from typing import Any
+
+
+class TextBuffer:
+    """Append-only string builder backed by a list of chunks.
+
+    Avoids the quadratic copying of repeated ``+=`` on long streams; the chunks
+    are joined once when the value is read.
+    """
+
+    __slots__ = ("_parts", "_length")
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._length = 0
+
+    def append(self, text: str) -> None:
+        if text:
+            self._parts.append(text)
+            self._length += len(text)
+
+    def getvalue(self) -> str:
+        if len(self._parts) > 1:
+            # Collapse so repeated reads don't re-join
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+
+class ToolResultStore:
+    """Holds each tool result exactly once, serialized, behind a reference id.
+
+    The serialized JSON string is the same object handed to the model as the
+    tool_result content, so the conversation and the store share one copy.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict[str, Any]] = {}
+
+    def put(self, tool_name: str, result: Any) -> str:
+        """Serialize and store a tool result, returning its reference id."""
+        ref = f"tr_{len(self._entries) + 1}"
+        self._entries[ref] = {
+            "tool": tool_name,
+            "json": json.dumps(result, default=str),
+        }
+        return ref
+
+    def get_json(self, ref: str) -> str:
+        """Return the serialized result for a reference id."""
+        return self._entries[ref]["json"]
+
+    def refs(self) -> list[dict[str, str]]:
+        """Return {"tool", "result_ref"} entries in the order results were stored."""
+        return [{"tool": entry["tool"], "result_ref": ref} for ref, entry in self._entries.items()]
+
+    def nbytes(self) -> int:
+        """Total size of the stored serialized results, in characters."""
+        return sum(len(entry["json"]) for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
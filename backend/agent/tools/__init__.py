@@ -1,7 +1,9 @@
 from .schema import introspect_schema
 from .query import execute_query
+from .profile import profile_table
 
 __all__ = [
     "introspect_schema",
     "execute_query",
+    "profile_table",
 ]
@@ -0,0 +1,52 @@
+"""Table profile tool for checking column statistics without probing queries."""
+
+from langchain_core.tools import tool
+from db.profiles import profile_store
+
+
+@tool
+def profile_table(table: str, columns: list[str] | None = None) -> dict:
+    """Get cached statistics and sample rows for a warehouse table.
+
+    Use this instead of exploratory queries like SELECT DISTINCT status ... or
+    SELECT MIN(date), MAX(date) ... before writing the real query. Profiles are
+    maintained in the background, so this is usually answered without touching
+    the warehouse. They are refreshed when new rows or newer dates appear, but
+    values changed in place may be up to an hour old for gold_marts/gold_metrics
+    and up to a day old elsewhere — query directly when exact current values matter.
+
+    Args:
+        table: Fully qualified table name (e.g. gold_metrics.v_daily_kpis).
+        columns: Optional list of column names to limit the column statistics to.
+
+    Returns:
+        A dictionary with:
+        - success: boolean indicating if a profile is available
+        - row_count: number of rows in the table
+        - columns: per-column stats — null_fraction, and for orderable types min,
+          max, distinct_count, plus top_values for low-cardinality columns
+        - sample_rows: a few example rows
+        - profiled_at: unix timestamp of when the statistics were computed
+        - error: error message (if unavailable)
+    """
+    try:
+        profile = profile_store.get_or_compute(table)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    if profile is None:
+        return {"success": False, "error": f"Unknown table: {table}. Use introspect_schema to find tables."}
+
+    column_stats = profile["columns"]
+    if columns:
+        column_stats = {name: stats for name, stats in column_stats.items() if name in columns}
+
+    return {
+        "success": True,
+        "table": table,
+        "row_count": profile["row_count"],
+        "columns": column_stats,
+        "sample_rows": profile["sample_rows"],
+        "profiled_at": profile["profiled_at"],
+        "error": None,
+    }
@@ -1,8 +1,10 @@
 """Query execution tool for running ad-hoc DuckDB SQL queries."""
 
 import re
+from datetime import date, datetime, timedelta
 from langchain_core.tools import tool
 from db.database import execute_sql
+from db.cache import result_cache, fingerprint_rows
 
 
 # Patterns that indicate potentially dangerous operations
@@ -21,6 +23,10 @@ DANGEROUS_PATTERNS = [
     r"\bCOPY\b",
 ]
 
+# Default trailing window (in days before the client's high-water mark) that
+# incremental refreshes are allowed to touch
+DEFAULT_DELTA_WINDOW_DAYS = 7
+
 
 def is_safe_query(sql: str) -> tuple[bool, str]:
     """Check if a query is safe to execute (read-only)."""
@@ -82,3 +88,146 @@ def execute_query(sql: str) -> dict:
             "columns": None,
             "row_count": 0,
         }
+
+
+def _delta_key_str(value) -> str:
+    """Normalize a delta key value to the ISO string the API serializes it as."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _window_cutoff(since: str, window_days: int) -> str | None:
+    """Return the ISO date string window_days before since, or None if unparseable."""
+    try:
+        high_water = date.fromisoformat(since[:10])
+        return (high_water - timedelta(days=window_days)).isoformat()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _group_by_key(rows: list[dict], delta_key: str) -> dict[str, list[dict]]:
+    """Group result rows by their delta key value, preserving row order.
+
+    Rows with a NULL delta key can't be placed in the window and are left out.
+    """
+    groups: dict[str, list[dict]] = {}
+    for row in rows:
+        if row.get(delta_key) is not None:
+            groups.setdefault(_delta_key_str(row[delta_key]), []).append(row)
+    return groups
+
+
+def execute_incremental_query(
+    sql: str,
+    delta_key: str,
+    since: str | None = None,
+    fingerprint: str | None = None,
+    window_days: int = DEFAULT_DELTA_WINDOW_DAYS,
+) -> dict:
+    """Execute a time-series query and return only rows changed since the client's copy.
+
+    The full result of every run is stored in the result cache under its fingerprint.
+    When the client sends back that fingerprint and its high-water mark (max delta key
+    value), the new result is diffed against the cached one by delta key. If every
+    new or changed key falls inside the trailing window ending at the high-water mark,
+    only those rows are returned along with the keys that disappeared; otherwise the
+    full result is returned.
+
+    Args:
+        sql: The SQL query to execute. Must be a SELECT statement.
+        delta_key: Date-like column used to group and diff rows (e.g. date, metric_date).
+        since: The client's cached high-water mark for delta_key.
+        fingerprint: Fingerprint of the client's cached result.
+        window_days: Size of the trailing window, in days before since.
+
+    Returns:
+        The execute_query result dictionary plus:
+        - incremental: True if data holds only new/changed rows
+        - delta_key: the delta key column
+        - fingerprint: fingerprint of the full, current result
+        - high_water_mark: max delta key value of the full result
+        - removed_keys: delta key values no longer present (incremental only)
+        - total_row_count: row count of the full, current result
+    """
+    is_safe, error_msg = is_safe_query(sql)
+    if not is_safe:
+        return {
+            "success": False,
+            "error": error_msg,
+            "data": None,
+            "columns": None,
+            "row_count": 0,
+        }
+
+    try:
+        results = execute_sql(sql)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "data": None,
+            "columns": None,
+            "row_count": 0,
+        }
+
+    columns = list(results[0].keys()) if results else []
+    current_fingerprint = fingerprint_rows(results)
+    # Compare raw values (dates, ints) and stringify afterwards — string order isn't numeric order
+    keys = [row[delta_key] for row in results if row.get(delta_key) is not None]
+    try:
+        high_water_mark = _delta_key_str(max(keys)) if keys and delta_key in columns else None
+    except TypeError:
+        high_water_mark = None
+    result_cache.set(current_fingerprint, {"sql": sql, "rows": results})
+
+    response = {
+        "success": True,
+        "data": results,
+        "columns": columns,
+        "row_count": len(results),
+        "error": None,
+        "incremental": False,
+        "delta_key": delta_key,
+        "fingerprint": current_fingerprint,
+        "high_water_mark": high_water_mark,
+        "removed_keys": [],
+        "total_row_count": len(results),
+    }
+
+    if not (since and fingerprint) or high_water_mark is None:
+        return response
+
+    cached = result_cache.get(fingerprint)
+    cutoff = _window_cutoff(since, window_days)
+    if cached is None or cached["sql"] != sql or cutoff is None:
+        return response
+
+    previous_null_rows = [row for row in cached["rows"] if row.get(delta_key) is None]
+    current_null_rows = [row for row in results if row.get(delta_key) is None]
+    if previous_null_rows != current_null_rows:
+        # NULL-keyed rows have no place in the window — send everything
+        return response
+
+    previous_groups = _group_by_key(cached["rows"], delta_key)
+    current_groups = _group_by_key(results, delta_key)
+
+    changed_keys = [
+        key for key, rows in current_groups.items()
+        if previous_groups.get(key) != rows
+    ]
+    if any(key < cutoff for key in changed_keys):
+        # History outside the trailing window moved — the client needs a full reload
+        return response
+
+    changed = set(changed_keys)
+    response.update({
+        "data": [
+            row for row in results
+            if row.get(delta_key) is not None and _delta_key_str(row[delta_key]) in changed
+        ],
+        "incremental": True,
+        "removed_keys": [key for key in previous_groups if key not in current_groups],
+    })
+    response["row_count"] = len(response["data"])
+    return response
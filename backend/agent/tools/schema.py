@@ -1,21 +1,57 @@
 """Schema introspection tool for exploring the MotherDuck data warehouse."""
 
 from langchain_core.tools import tool
-from db.database import get_schema_info
+from db.catalog import get_catalog
+from db.profiles import profile_store
 
 
 @tool
-def introspect_schema() -> dict:
-    """Get the data warehouse schema including all tables and their columns.
+def introspect_schema(
+    schema_name: str | None = None,
+    table_pattern: str | None = None,
+    topic: str | None = None,
+    include_profile: bool = False,
+) -> dict:
+    """Get the data warehouse schema: tables and their columns.
 
-    Returns information about all tables across the BrowserBase warehouse schemas
-    (bronze_supabase, silver_core, gold_marts, gold_metrics), including column names
-    and data types. Use this to understand what data is available before writing queries.
+    Covers the BrowserBase warehouse schemas (bronze_supabase, silver_core,
+    gold_marts, gold_metrics). Narrow the result with any combination of filters
+    instead of fetching everything — the full schema is large.
 
     Tables are returned as schema.table_name keys (e.g. gold_metrics.v_daily_kpis).
 
+    Args:
+        schema_name: Only return tables in this schema (e.g. gold_metrics).
+        table_pattern: Table name pattern; glob wildcards allowed (e.g. "fct_*_daily"),
+            otherwise matched as a substring (e.g. "kpis").
+        topic: Free-text topic (e.g. "cohort retention", "invoice revenue") — returns
+            the most relevant tables by table/column names and descriptions.
+        include_profile: Attach cached column statistics (null_fraction, min, max,
+            distinct_count, top_values) to each column where a profile exists.
+
     Returns:
         A dictionary mapping fully-qualified table names to lists of column definitions.
-        Each column definition includes: name, type, nullable.
+        Each column definition includes: name, type, nullable (and description if documented,
+        profile if requested and available). If the warehouse can't be reached, a dictionary
+        with a single "error" key instead.
     """
-    return get_schema_info()
+    catalog = get_catalog()
+    if catalog.is_fallback:
+        return {"error": "schema unavailable — the warehouse could not be reached, try again shortly"}
+
+    tables = catalog.filter(schema=schema_name, table_pattern=table_pattern, topic=topic)
+    if not include_profile:
+        return tables
+
+    enriched = {}
+    for full_name, columns in tables.items():
+        profile = profile_store.get(full_name)
+        if profile is None:
+            enriched[full_name] = columns
+            continue
+        enriched[full_name] = [
+            {**column, "profile": profile["columns"][column["name"]]}
+            if column["name"] in profile["columns"] else column
+            for column in columns
+        ]
+    return enriched
@@ -0,0 +1,107 @@
+"""Cold-start benchmark for the BasedHoc backend.
+
+Measures, each in a fresh interpreter:
+- import time of main (what uvicorn pays before serving) and of agent.agent
+- time from process spawn to the first successful /health response
+- time from process spawn to /ready reporting ready (warm pool and schema cache)
+
+Usage (from backend/):
+    python bench_startup.py [--runs 3] [--port 8765] [--ready-timeout 60]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+
+
+def measure_import_ms(module: str) -> float:
+    """Import a module in a fresh interpreter and return the import time in ms."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _get(url: str) -> tuple[int, dict | None]:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def measure_server_start(port: int, ready_timeout: float) -> dict:
+    """Start uvicorn and time the first /health and /ready responses."""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    result = {"first_request_ms": None, "ready_ms": None, "ready_state": None}
+    try:
+        while time.perf_counter() - started < ready_timeout:
+            try:
+                if result["first_request_ms"] is None:
+                    status, _ = _get(f"http://127.0.0.1:{port}/health")
+                    if status == 200:
+                        result["first_request_ms"] = (time.perf_counter() - started) * 1000
+                else:
+                    status, body = _get(f"http://127.0.0.1:{port}/ready")
+                    result["ready_state"] = body
+                    if status == 200:
+                        result["ready_ms"] = (time.perf_counter() - started) * 1000
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+    return result
+
+
+def _summary(values: list[float]) -> str:
+    if not values:
+        return "n/a"
+    return f"median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms   max {max(values):8.1f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    import_main = [measure_import_ms("main") for _ in range(args.runs)]
+    import_agent = [measure_import_ms("agent.agent") for _ in range(args.runs)]
+    starts = [measure_server_start(args.port, args.ready_timeout) for _ in range(args.runs)]
+
+    print(f"import main             {_summary(import_main)}")
+    print(f"import agent.agent      {_summary(import_agent)}")
+    print(f"time to first request   {_summary([s['first_request_ms'] for s in starts if s['first_request_ms']])}")
+    print(f"time to ready           {_summary([s['ready_ms'] for s in starts if s['ready_ms']])}")
+
+    not_ready = [s["ready_state"] for s in starts if s["ready_ms"] is None]
+    if not_ready:
+        print(f"{len(not_ready)} run(s) never became ready; last state:")
+        print(json.dumps(not_ready[-1], indent=2))
+
+
+if __name__ == "__main__":
+    main()
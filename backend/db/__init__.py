@@ -1,3 +1,21 @@
-from .database import get_db, get_connection, test_connection, execute_sql, get_schema_info
+from .database import get_db, get_connection, test_connection, execute_sql, get_schema_info, get_schema_comments
+from .cache import ResultCache, result_cache, fingerprint_rows
+from .catalog import SchemaCatalog, get_catalog
+from .profiles import ProfileStore, profile_store, start_background_refresh
 
-__all__ = ["get_db", "get_connection", "test_connection", "execute_sql", "get_schema_info"]
+__all__ = [
+    "get_db",
+    "get_connection",
+    "test_connection",
+    "execute_sql",
+    "get_schema_info",
+    "get_schema_comments",
+    "ResultCache",
+    "result_cache",
+    "fingerprint_rows",
+    "SchemaCatalog",
+    "get_catalog",
+    "ProfileStore",
+    "profile_store",
+    "start_background_refresh",
+]
@@ -0,0 +1,299 @@
+"""Indexed schema catalog for the BrowserBase warehouse.
+
+Wraps the information_schema column listing with table descriptions and an
+in-memory keyword/trigram index, so callers can fetch only the tables that
+match a schema, a table-name pattern, or a free-text topic.
+"""
+
+import fnmatch
+import re
+import threading
+import time
+
+from db.database import RELEVANT_SCHEMAS, get_schema_info, get_schema_comments
+
+# How long a loaded catalog is served before information_schema is re-read
+CATALOG_TTL_SECONDS = 600
+
+# After a failed load, serve the fallback (or stale) catalog this long before retrying
+CATALOG_FAILURE_TTL_SECONDS = 60
+
+# Max tables returned for a topic search
+DEFAULT_TOPIC_LIMIT = 8
+
+# Schema headings and blurbs for the system prompt's table list
+SCHEMA_LABELS = {
+    "bronze_supabase": ("Bronze Layer (Raw Data)", "Raw tables ingested from Supabase"),
+    "silver_core": ("Silver Layer (Cleaned/Staged)", "Cleaned dimensions and facts"),
+    "gold_marts": ("Gold Layer (Marts)", "Pre-aggregated team fact tables"),
+    "gold_metrics": ("Gold Layer (KPI Views)", "Ready-to-query KPI views"),
+}
+
+# Fallback descriptions used when the warehouse has no table comments
+TABLE_DESCRIPTIONS = {
+    "bronze_supabase.api_keys": "Raw API keys",
+    "bronze_supabase.browser_sessions": "Raw browser sessions",
+    "bronze_supabase.invoices": "Raw invoices",
+    "bronze_supabase.organizations": "Raw organizations",
+    "bronze_supabase.plans": "Raw plans",
+    "bronze_supabase.projects": "Raw projects",
+    "bronze_supabase.session_events": "Raw session events",
+    "bronze_supabase.subscriptions": "Raw subscriptions",
+    "bronze_supabase.usage_records": "Raw usage records",
+    "bronze_supabase.users": "Raw users",
+    "silver_core.dim_org": "Organization dimension",
+    "silver_core.dim_user": "User dimension",
+    "silver_core.core_sessions": "Cleaned browser sessions",
+    "silver_core.fct_browser_run": "Browser run facts",
+    "silver_core.fct_event": "Session event facts",
+    "silver_core.fct_subscription": "Subscription facts",
+    "gold_marts.fct_daily_sessions": "Daily session counts",
+    "gold_marts.fct_monthly_revenue": "Monthly revenue aggregations",
+    "gold_marts.fct_engineering_daily": "Engineering team daily metrics",
+    "gold_marts.fct_growth_daily": "Growth team daily metrics",
+    "gold_marts.fct_ops_daily": "Operations team daily metrics",
+    "gold_marts.fct_product_daily": "Product team daily metrics",
+    "gold_metrics.v_daily_kpis": "Daily KPI summary",
+    "gold_metrics.v_mrr": "Monthly recurring revenue",
+    "gold_metrics.v_cohort_retention": "Cohort retention analysis",
+    "gold_metrics.v_active_organizations": "Active org metrics",
+    "gold_metrics.v_growth_kpis": "Growth team KPIs",
+    "gold_metrics.v_engineering_kpis": "Engineering team KPIs",
+    "gold_metrics.v_ops_kpis": "Operations team KPIs",
+    "gold_metrics.v_product_kpis": "Product team KPIs",
+}
+
+# Common abbreviations in table/column names, expanded so topic searches match
+TOKEN_SYNONYMS = {
+    "org": "organization",
+    "orgs": "organization",
+    "fct": "fact",
+    "dim": "dimension",
+    "mrr": "revenue",
+    "kpi": "metric",
+    "kpis": "metric",
+    "pct": "percent",
+    "eng": "engineering",
+    "ops": "operations",
+}
+
+# Weights for where a query token was found
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 2.0
+COLUMN_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 1.5
+
+
+def tokenize(text: str) -> list[str]:
+    """Split identifiers and prose into lowercase keyword tokens."""
+    tokens = []
+    for word in re.split(r"[^a-z0-9]+", text.lower()):
+        if not word:
+            continue
+        tokens.append(word)
+        if word in TOKEN_SYNONYMS:
+            tokens.append(TOKEN_SYNONYMS[word])
+        elif word.endswith("s") and len(word) > 3:
+            tokens.append(word[:-1])
+    return tokens
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the character trigrams of text, padded at word boundaries."""
+    grams: set[str] = set()
+    for word in re.split(r"[^a-z0-9]+", text.lower()):
+        if not word:
+            continue
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SchemaCatalog:
+    """Tables, columns and descriptions with a keyword/trigram search index."""
+
+    def __init__(self, schema: dict, comments: dict | None = None, is_fallback: bool = False):
+        comments = comments or {"tables": {}, "columns": {}}
+        # True for the column-less stand-in served while the warehouse is unreachable
+        self.is_fallback = is_fallback
+        self.tables: dict[str, list[dict]] = {}
+        self.descriptions: dict[str, str] = {}
+
+        for full_name, columns in schema.items():
+            column_comments = comments["columns"].get(full_name, {})
+            self.tables[full_name] = [
+                {**column, "description": column_comments[column["name"]]}
+                if column_comments.get(column["name"]) else column
+                for column in columns
+            ]
+            self.descriptions[full_name] = (
+                comments["tables"].get(full_name) or TABLE_DESCRIPTIONS.get(full_name, "")
+            )
+
+        self._keyword_index: dict[str, dict[str, float]] = {}
+        self._trigram_index: dict[str, set[str]] = {}
+        self._trigram_counts: dict[str, int] = {}
+        self._build_index()
+
+    def _add_keywords(self, full_name: str, text: str, weight: float) -> None:
+        for token in tokenize(text):
+            postings = self._keyword_index.setdefault(token, {})
+            postings[full_name] = max(postings.get(full_name, 0.0), weight)
+
+    def _build_index(self) -> None:
+        for full_name, columns in self.tables.items():
+            table_name = full_name.split(".", 1)[1]
+            self._add_keywords(full_name, table_name, NAME_WEIGHT)
+            self._add_keywords(full_name, self.descriptions[full_name], DESCRIPTION_WEIGHT)
+            for column in columns:
+                self._add_keywords(full_name, column["name"], COLUMN_WEIGHT)
+                self._add_keywords(full_name, column.get("description", ""), COLUMN_WEIGHT)
+
+            grams = trigrams(f"{table_name} {self.descriptions[full_name]}")
+            self._trigram_counts[full_name] = len(grams)
+            for gram in grams:
+                self._trigram_index.setdefault(gram, set()).add(full_name)
+
+    def search(self, topic: str, limit: int = DEFAULT_TOPIC_LIMIT) -> list[str]:
+        """Return table names ranked by relevance to a free-text topic."""
+        scores: dict[str, float] = {}
+
+        for token in set(tokenize(topic)):
+            for full_name, weight in self._keyword_index.get(token, {}).items():
+                scores[full_name] = scores.get(full_name, 0.0) + weight
+
+        # Trigram overlap catches partial words and typos ("retent", "engneering")
+        query_grams = trigrams(topic)
+        if query_grams:
+            overlap: dict[str, int] = {}
+            for gram in query_grams:
+                for full_name in self._trigram_index.get(gram, ()):
+                    overlap[full_name] = overlap.get(full_name, 0) + 1
+            for full_name, count in overlap.items():
+                similarity = count / (len(query_grams) + self._trigram_counts[full_name] - count)
+                scores[full_name] = scores.get(full_name, 0.0) + TRIGRAM_WEIGHT * similarity
+
+        ranked = sorted(
+            (name for name, score in scores.items() if score >= TRIGRAM_WEIGHT * 0.2),
+            key=lambda name: (-scores[name], name),
+        )
+        return ranked[:limit]
+
+    def filter(
+        self,
+        schema: str | None = None,
+        table_pattern: str | None = None,
+        topic: str | None = None,
+    ) -> dict:
+        """Return the table → columns mapping restricted to the matching tables."""
+        names = list(self.tables)
+
+        if schema:
+            names = [name for name in names if name.split(".", 1)[0] == schema]
+
+        if table_pattern:
+            pattern = table_pattern.lower()
+            if not any(ch in pattern for ch in "*?["):
+                pattern = f"*{pattern}*"
+            names = [
+                name for name in names
+                if fnmatch.fnmatch(name.lower(), pattern)
+                or fnmatch.fnmatch(name.split(".", 1)[1].lower(), pattern)
+            ]
+
+        if topic:
+            allowed = set(names)
+            names = [name for name in self.search(topic, limit=len(self.tables)) if name in allowed]
+            names = names[:DEFAULT_TOPIC_LIMIT]
+
+        return {name: self.tables[name] for name in names}
+
+    def render_table_list(self) -> str:
+        """Render the catalog's tables as a markdown outline for the system prompt."""
+        sections = []
+        for schema in RELEVANT_SCHEMAS:
+            names = sorted(name for name in self.tables if name.split(".", 1)[0] == schema)
+            if not names:
+                continue
+            title, blurb = SCHEMA_LABELS.get(schema, (schema, "Tables"))
+            lines = [f"### {title} — `{schema}`", f"{blurb}:"]
+            for name in names:
+                table_name = name.split(".", 1)[1]
+                description = self.descriptions.get(name)
+                lines.append(f"- `{table_name}` — {description}" if description else f"- `{table_name}`")
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
+
+
+def _fallback_catalog() -> SchemaCatalog:
+    """Build a column-less catalog from the static table descriptions.
+
+    Good enough for the system prompt's table list, but callers that need
+    columns should check is_fallback and report the schema as unavailable.
+    """
+    return SchemaCatalog({name: [] for name in TABLE_DESCRIPTIONS}, is_fallback=True)
+
+
+_catalog: SchemaCatalog | None = None
+_catalog_loaded_at = 0.0
+_fallback: SchemaCatalog | None = None
+_last_failure_at: float | None = None
+_refresh_thread: threading.Thread | None = None
+_catalog_lock = threading.Lock()
+
+
+def _load_catalog() -> SchemaCatalog | None:
+    """Load the catalog from MotherDuck and install it. Returns None on failure."""
+    global _catalog, _catalog_loaded_at, _last_failure_at
+
+    try:
+        schema = get_schema_info()
+        try:
+            comments = get_schema_comments()
+        except Exception:
+            comments = None
+        catalog = SchemaCatalog(schema, comments)
+    except Exception as e:
+        print(f"WARNING: schema catalog load failed — {e}")
+        with _catalog_lock:
+            _last_failure_at = time.monotonic()
+        return None
+
+    with _catalog_lock:
+        _catalog = catalog
+        _catalog_loaded_at = time.monotonic()
+        _last_failure_at = None
+    return catalog
+
+
+def _recently_failed() -> bool:
+    return _last_failure_at is not None and time.monotonic() - _last_failure_at < CATALOG_FAILURE_TTL_SECONDS
+
+
+def get_catalog(force_refresh: bool = False) -> SchemaCatalog:
+    """Return the shared schema catalog.
+
+    The first load is synchronous; after that a stale catalog keeps being served
+    while a background thread reloads it. Load failures are remembered for
+    CATALOG_FAILURE_TTL_SECONDS so an outage doesn't add a warehouse round trip
+    to every caller. force_refresh always loads synchronously.
+    """
+    global _fallback, _refresh_thread
+
+    if force_refresh:
+        return _load_catalog() or _catalog or _fallback_catalog()
+
+    with _catalog_lock:
+        catalog = _catalog
+        is_stale = catalog is not None and time.monotonic() - _catalog_loaded_at >= CATALOG_TTL_SECONDS
+        if is_stale and not _recently_failed() and (_refresh_thread is None or not _refresh_thread.is_alive()):
+            _refresh_thread = threading.Thread(target=_load_catalog, daemon=True)
+            _refresh_thread.start()
+        if catalog is not None:
+            return catalog
+        if _recently_failed():
+            if _fallback is None:
+                _fallback = _fallback_catalog()
+            return _fallback
+
+    return _load_catalog() or get_catalog()
@@ -1,12 +1,16 @@
 """Database connection and utilities for BasedHoc (MotherDuck/DuckDB)."""
 
 import os
-import duckdb
 from contextlib import contextmanager
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
 from dotenv import load_dotenv
 
+from tracing import span, SPAN_KIND_CLIENT
+
+if TYPE_CHECKING:
+    import duckdb
+
 load_dotenv()
 
 MOTHERDUCK_TOKEN = os.getenv("MOTHERDUCK_TOKEN", "")
@@ -16,14 +20,17 @@ MOTHERDUCK_DATABASE = os.getenv("MOTHERDUCK_DATABASE", "browserbase_demo")
 RELEVANT_SCHEMAS = ["bronze_supabase", "silver_core", "gold_marts", "gold_metrics"]
 
 
-def get_connection() -> duckdb.DuckDBPyConnection:
+def get_connection() -> "duckdb.DuckDBPyConnection":
     """Create a new MotherDuck connection."""
+    # Imported on first connection to keep application import time low
+    import duckdb
+
     conn_str = f"md:{MOTHERDUCK_DATABASE}?motherduck_token={MOTHERDUCK_TOKEN}"
     return duckdb.connect(conn_str)
 
 
 @contextmanager
-def get_db() -> Generator[duckdb.DuckDBPyConnection, None, None]:
+def get_db() -> Generator["duckdb.DuckDBPyConnection", None, None]:
     """Context manager for database connections."""
     conn = get_connection()
     try:
@@ -41,13 +48,25 @@ def test_connection() -> bool:
 
 def execute_sql(sql: str, params: tuple = ()) -> list[dict]:
     """Execute SQL and return results as list of dicts."""
-    with get_db() as conn:
-        cursor = conn.execute(sql, params if params else None)
-        if cursor.description is None:
-            return []
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in rows]
+    with span("duckdb.execute_sql", kind=SPAN_KIND_CLIENT, attributes={
+        "db.system": "duckdb",
+        "db.name": MOTHERDUCK_DATABASE,
+        "db.statement": sql[:2000],
+    }) as query_span:
+        with span("duckdb.connect"):
+            conn = get_connection()
+        try:
+            with span("duckdb.execute"):
+                cursor = conn.execute(sql, params if params else None)
+            if cursor.description is None:
+                return []
+            columns = [desc[0] for desc in cursor.description]
+            with span("duckdb.fetch"):
+                rows = cursor.fetchall()
+            query_span.set_attribute("db.row_count", len(rows))
+            return [dict(zip(columns, row)) for row in rows]
+        finally:
+            conn.close()
 
 
 def get_schema_info() -> dict:
@@ -76,3 +95,29 @@ def get_schema_info() -> dict:
             })
 
         return schema
+
+
+def get_schema_comments() -> dict:
+    """Get table, view and column comments (COMMENT ON ...) for the relevant schemas."""
+    with get_db() as conn:
+        schema_filter = ", ".join(f"'{s}'" for s in RELEVANT_SCHEMAS)
+        table_rows = conn.execute(f"""
+            SELECT schema_name, table_name, comment FROM duckdb_tables()
+            WHERE schema_name IN ({schema_filter}) AND comment IS NOT NULL
+            UNION ALL
+            SELECT schema_name, view_name, comment FROM duckdb_views()
+            WHERE schema_name IN ({schema_filter}) AND comment IS NOT NULL
+        """).fetchall()
+        column_rows = conn.execute(f"""
+            SELECT schema_name, table_name, column_name, comment FROM duckdb_columns()
+            WHERE schema_name IN ({schema_filter}) AND comment IS NOT NULL
+        """).fetchall()
+
+        comments: dict = {"tables": {}, "columns": {}}
+        for table_schema, table_name, comment in table_rows:
+            comments["tables"][f"{table_schema}.{table_name}"] = comment
+        for table_schema, table_name, column_name, comment in column_rows:
+            full_name = f"{table_schema}.{table_name}"
+            comments["columns"].setdefault(full_name, {})[column_name] = comment
+
+        return comments
@@ -0,0 +1,271 @@
+"""Column statistics and sample-row store for the BrowserBase warehouse.
+
+Profiles (row count, per-column min/max, null fraction, distinct estimate,
+top values for low-cardinality columns, and a few sample rows) are computed
+against MotherDuck and kept in memory. A background thread refreshes them
+incrementally: tables whose change signature (row count plus the max of each
+date/timestamp column) hasn't moved are only re-checked, not re-profiled,
+until their profile reaches its max age.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+from db.database import get_db
+from db.catalog import get_catalog
+
+# Seconds between background refresh passes (0 disables the background thread)
+PROFILE_REFRESH_INTERVAL_SECONDS = int(os.getenv("PROFILE_REFRESH_INTERVAL_SECONDS", "900"))
+
+# Tables re-checked per background pass, least recently attempted first
+PROFILE_REFRESH_BATCH_SIZE = 5
+
+# A profile is re-checked after this long, and fully recomputed after the max age.
+# A table whose refresh failed is retried after the same delay.
+PROFILE_TTL_SECONDS = 900
+PROFILE_MAX_AGE_SECONDS = 24 * 3600
+
+# Aggregate layers rewrite rows in place (e.g. today's KPI row), which the change
+# signature can miss, so their profiles are recomputed more often
+SCHEMA_MAX_AGE_SECONDS = {
+    "gold_marts": 3600,
+    "gold_metrics": 3600,
+}
+
+# Columns with at most this many distinct values get top-k value counts
+LOW_CARDINALITY_THRESHOLD = 25
+TOP_K_VALUES = 10
+SAMPLE_ROW_COUNT = 3
+MAX_VALUE_LENGTH = 100
+
+# Column types that support MIN/MAX and GROUP BY
+ORDERABLE_TYPE_PATTERN = re.compile(
+    r"^(U?(TINY|SMALL|BIG|HUGE)?INT(EGER)?|DECIMAL|NUMERIC|DOUBLE|FLOAT|REAL|"
+    r"DATE|TIMESTAMP|TIME|INTERVAL|VARCHAR|TEXT|STRING|BOOLEAN|UUID)",
+    re.IGNORECASE,
+)
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_table(full_name: str) -> str:
+    return ".".join(_quote_identifier(part) for part in full_name.split(".", 1))
+
+
+def _json_safe(value):
+    """Convert warehouse values to compact JSON-serializable values."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime, dt_time)):
+        return value.isoformat()
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_LENGTH else text[:MAX_VALUE_LENGTH] + "…"
+
+
+def _is_orderable(data_type: str) -> bool:
+    return bool(ORDERABLE_TYPE_PATTERN.match(data_type)) and "[" not in data_type
+
+
+def compute_table_profile(full_name: str, columns: list[dict]) -> dict:
+    """Profile a table: row count, column statistics, top values and sample rows."""
+    table = _quote_table(full_name)
+    orderable = [column for column in columns if _is_orderable(column["type"])]
+
+    with get_db() as conn:
+        select_parts = ["count(*)"]
+        for column in columns:
+            select_parts.append(f"count({_quote_identifier(column['name'])})")
+        for column in orderable:
+            quoted = _quote_identifier(column["name"])
+            select_parts += [f"min({quoted})", f"max({quoted})", f"approx_count_distinct({quoted})"]
+        stats = conn.execute(f"SELECT {', '.join(select_parts)} FROM {table}").fetchone()
+
+        row_count = stats[0]
+        non_null_counts = stats[1:1 + len(columns)]
+        orderable_stats = stats[1 + len(columns):]
+
+        column_profiles: dict[str, dict] = {}
+        for column, non_null in zip(columns, non_null_counts):
+            column_profiles[column["name"]] = {
+                "null_fraction": round(1 - non_null / row_count, 4) if row_count else None,
+            }
+        low_cardinality = []
+        for i, column in enumerate(orderable):
+            min_value, max_value, distinct = orderable_stats[3 * i:3 * i + 3]
+            column_profiles[column["name"]].update({
+                "min": _json_safe(min_value),
+                "max": _json_safe(max_value),
+                "distinct_count": distinct,
+            })
+            if distinct is not None and distinct <= LOW_CARDINALITY_THRESHOLD:
+                low_cardinality.append(column["name"])
+
+        if low_cardinality and row_count:
+            branches = [
+                f"SELECT '{name.replace(chr(39), chr(39) * 2)}' AS column_name, "
+                f"CAST({_quote_identifier(name)} AS VARCHAR) AS value, count(*) AS n "
+                f"FROM {table} GROUP BY 2"
+                for name in low_cardinality
+            ]
+            top_rows = conn.execute(f"""
+                SELECT column_name, value, n FROM ({' UNION ALL '.join(branches)})
+                QUALIFY row_number() OVER (PARTITION BY column_name ORDER BY n DESC) <= {TOP_K_VALUES}
+                ORDER BY column_name, n DESC
+            """).fetchall()
+            for name, value, n in top_rows:
+                column_profiles[name].setdefault("top_values", []).append({
+                    "value": _json_safe(value),
+                    "count": n,
+                })
+
+        cursor = conn.execute(f"SELECT * FROM {table} LIMIT {SAMPLE_ROW_COUNT}")
+        sample_columns = [desc[0] for desc in cursor.description]
+        sample_rows = [
+            {name: _json_safe(value) for name, value in zip(sample_columns, row)}
+            for row in cursor.fetchall()
+        ]
+
+    now = time.time()
+    return {
+        "table": full_name,
+        "row_count": row_count,
+        "columns": column_profiles,
+        "sample_rows": sample_rows,
+        "profiled_at": now,
+        "checked_at": now,
+    }
+
+
+def _is_temporal(data_type: str) -> bool:
+    return data_type.upper().startswith(("DATE", "TIMESTAMP"))
+
+
+def table_signature(full_name: str, columns: list[dict]) -> list:
+    """Return a cheap change signal: row count plus the max of every date/timestamp column.
+
+    Catches appended rows and rows whose updated_at/date moved forward.
+    """
+    parts = ["count(*)"] + [
+        f"max({_quote_identifier(column['name'])})"
+        for column in columns if _is_temporal(column["type"])
+    ]
+    with get_db() as conn:
+        row = conn.execute(f"SELECT {', '.join(parts)} FROM {_quote_table(full_name)}").fetchone()
+    return [_json_safe(value) for value in row]
+
+
+def profile_max_age(full_name: str) -> int:
+    """Return how long a profile of this table may be reused before a full recompute."""
+    return SCHEMA_MAX_AGE_SECONDS.get(full_name.split(".", 1)[0], PROFILE_MAX_AGE_SECONDS)
+
+
+class ProfileStore:
+    """In-memory table profiles with incremental refresh."""
+
+    def __init__(self):
+        self._profiles: dict[str, dict] = {}
+        # When each table's last background refresh failed, so failing tables go to the back
+        self._failed_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, full_name: str) -> dict | None:
+        """Return the stored profile for a table, if any."""
+        with self._lock:
+            return self._profiles.get(full_name)
+
+    def get_or_compute(self, full_name: str) -> dict | None:
+        """Return the stored profile, profiling the table now if it has none."""
+        profile = self.get(full_name)
+        if profile is None:
+            profile = self.refresh_table(full_name, force=True)
+        return profile
+
+    def refresh_table(self, full_name: str, force: bool = False) -> dict | None:
+        """Re-check a table, re-profiling it only if its signature changed or it aged out."""
+        catalog = get_catalog()
+        if catalog.is_fallback:
+            raise RuntimeError("schema unavailable — the warehouse could not be reached, try again shortly")
+        columns = catalog.tables.get(full_name)
+        if columns is None:
+            return None
+
+        current = self.get(full_name)
+        now = time.time()
+        signature = table_signature(full_name, columns)
+        if current is not None and not force and now - current["profiled_at"] < profile_max_age(full_name):
+            if signature == current.get("signature"):
+                with self._lock:
+                    current["checked_at"] = now
+                return current
+
+        profile = compute_table_profile(full_name, columns)
+        profile["signature"] = signature
+        with self._lock:
+            self._profiles[full_name] = profile
+        return profile
+
+    def refresh_stale(self, batch_size: int = PROFILE_REFRESH_BATCH_SIZE) -> int:
+        """Refresh up to batch_size tables that were never checked or are past their TTL.
+
+        Returns how many stale tables are left for the next pass.
+        """
+        catalog = get_catalog()
+        if catalog.is_fallback:
+            return 0
+
+        now = time.time()
+        stale = []
+        for full_name in catalog.tables:
+            profile = self.get(full_name)
+            checked_at = profile["checked_at"] if profile else 0.0
+            with self._lock:
+                attempted_at = max(checked_at, self._failed_at.get(full_name, 0.0))
+            if now - attempted_at >= PROFILE_TTL_SECONDS:
+                stale.append((attempted_at, full_name))
+
+        stale.sort()
+        for _, full_name in stale[:batch_size]:
+            try:
+                self.refresh_table(full_name)
+                with self._lock:
+                    self._failed_at.pop(full_name, None)
+            except Exception as e:
+                print(f"WARNING: profiling {full_name} failed — {e}")
+                with self._lock:
+                    self._failed_at[full_name] = time.time()
+        return max(len(stale) - batch_size, 0)
+
+
+profile_store = ProfileStore()
+
+_refresh_thread: threading.Thread | None = None
+
+
+def _refresh_loop(interval: int) -> None:
+    while True:
+        try:
+            # Drain the stale backlog quickly, then settle into the regular interval
+            remaining = profile_store.refresh_stale()
+        except Exception as e:
+            print(f"WARNING: profile refresh pass failed — {e}")
+            remaining = 0
+        time.sleep(1 if remaining else interval)
+
+
+def start_background_refresh(interval: int = PROFILE_REFRESH_INTERVAL_SECONDS) -> bool:
+    """Start the background profile refresh thread once. Returns False if disabled."""
+    global _refresh_thread
+    if interval <= 0:
+        return False
+    if _refresh_thread is None or not _refresh_thread.is_alive():
+        _refresh_thread = threading.Thread(target=_refresh_loop, args=(interval,), daemon=True)
+        _refresh_thread.start()
+    return True
@@ -9,33 +9,38 @@ if _ssl_cert and not os.path.exists(_ssl_cert):
     os.environ.pop("SSL_CERT_FILE", None)
     os.environ.pop("SSL_CERT_DIR", None)
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import uuid
 from contextlib import asynccontextmanager
 import json
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+# Agent and LangChain modules are imported inside the endpoints that use them
+# (and preloaded by warm-up) so they don't slow down cold starts.
 from models.chat import ChatRequest, ChatResponse
-from agent.agent import run_agent, run_agent_streaming
-from agent.tools.schema import introspect_schema
-from agent.tools.query import execute_query
-from db.database import get_schema_info, test_connection
+from db.database import get_schema_info
+from tracing import TracingMiddleware, TRACE_ID_HEADER, current_trace_id
+from warmup import WARMUP_BLOCKING, start_warmup, warmup_state
+
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Test MotherDuck connection on startup."""
-    try:
-        if test_connection():
-            print("MotherDuck connection verified.")
-        else:
-            print("WARNING: MotherDuck connection test returned unexpected result.")
-    except Exception as e:
-        print(f"WARNING: MotherDuck connection failed — {e}")
-        print("Set MOTHERDUCK_TOKEN in .env to connect.")
+    """Warm up MotherDuck, the schema catalog and agent modules in the background."""
+    start_warmup()
+    if WARMUP_BLOCKING:
+        # Wait for one pass only; retries after a failure continue in the background
+        await asyncio.to_thread(warmup_state.first_pass_done.wait)
     yield
+    warmup_state.stopped.set()
 
 
 app = FastAPI(
@@ -64,15 +69,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_ID_HEADER],
 )
 
+# Per-request tracing span; the trace id is returned in the X-Trace-Id header
+app.add_middleware(TracingMiddleware)
+
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check — the process is up and serving requests."""
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check — MotherDuck is reachable and the schema catalog is loaded."""
+    state = warmup_state.snapshot()
+    state["import_ms"] = IMPORT_MS
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
 @app.get("/api/schema")
 async def get_schema():
     """Get the data warehouse schema for reference."""
@@ -90,6 +107,8 @@ async def get_schema():
 @app.get("/api/reports/schema")
 async def run_schema_introspection():
     """Execute schema introspection directly."""
+    from agent.tools.schema import introspect_schema
+
     try:
         result = introspect_schema.invoke({})
         return {"success": True, "schema": result}
@@ -99,12 +118,29 @@ async def run_schema_introspection():
 
 class CustomQueryParams(BaseModel):
     sql: str
+    # Incremental refresh: set delta_key to get a fingerprint back, then send
+    # since/fingerprint from the cached result to receive only changed rows.
+    delta_key: str | None = None
+    since: str | None = None
+    fingerprint: str | None = None
+    window_days: int | None = Field(None, ge=1, le=3650)
 
 
 @app.post("/api/reports/query")
 async def run_custom_query(params: CustomQueryParams):
     """Execute a custom SQL query directly."""
+    from agent.tools.query import execute_query, execute_incremental_query
+
     try:
+        if params.delta_key:
+            options = {"window_days": params.window_days} if params.window_days is not None else {}
+            return execute_incremental_query(
+                sql=params.sql,
+                delta_key=params.delta_key,
+                since=params.since,
+                fingerprint=params.fingerprint,
+                **options,
+            )
         result = execute_query.invoke({"sql": params.sql})
         return result
     except Exception as e:
@@ -118,6 +154,8 @@ async def run_custom_query(params: CustomQueryParams):
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Send a message to the chat agent."""
+    from agent.agent import run_agent
+
     try:
         # Generate conversation ID if not provided
         conversation_id = request.conversation_id or str(uuid.uuid4())
@@ -152,6 +190,7 @@ async def chat(request: ChatRequest):
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
     """Stream chat responses with extended thinking visible."""
+    from agent.agent import run_agent_streaming
 
     async def event_generator():
         try:
@@ -166,12 +205,12 @@ async def chat_stream(request: ChatRequest):
                 history=history,
             ):
                 # Format as SSE
-                yield f"data: {json.dumps(event)}\n\n"
+                yield f"data: {json.dumps(event, default=str)}\n\n"
 
         except Exception as e:
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e), 'trace_id': current_trace_id()})}\n\n"
 
     return StreamingResponse(
         event_generator(),
@@ -0,0 +1,348 @@
+"""Lightweight request tracing for BasedHoc.
+
+OpenTelemetry-style spans (trace/span ids, parent links, attributes, events)
+without the SDK dependency. Finished spans are batched and exported to a JSONL
+file or to an OTLP/HTTP collector (JSON encoding), selected with TRACING_EXPORTER.
+
+The active span lives in a context variable, so spans opened inside the HTTP
+request (tool calls, DuckDB queries) nest under it automatically. Spans that stay
+open across ``yield`` in an async generator should be given an explicit parent
+instead of being made current.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Generator
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Exporter selection: "none", "jsonl" or "otlp"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "basedhoc-backend")
+
+TRACE_ID_HEADER = "X-Trace-Id"
+
+# Batching for the export thread
+EXPORT_BATCH_SIZE = 256
+EXPORT_INTERVAL_SECONDS = 2.0
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        parent: "Span | None" = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.events: list[dict] = []
+        self.status_code = "UNSET"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, error: BaseException) -> None:
+        self.add_event("exception", {
+            "exception.type": type(error).__name__,
+            "exception.message": str(error),
+        })
+        self.status_code = "ERROR"
+        self.status_message = str(error)
+
+    def record_exit(self, error: BaseException) -> None:
+        """Record why a span was left early.
+
+        A closed generator or cancelled task means the client went away, not that
+        the operation failed, so it is marked as a disconnect without error status.
+        """
+        if isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            self.set_attribute("client.disconnected", True)
+            self.add_event("client.disconnected", {"exit.type": type(error).__name__})
+        else:
+            self.record_exception(error)
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the span started."""
+        return (time.time_ns() - self.start_ns) / 1e6
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        _processor.on_end(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": self.status_code, "message": self.status_message},
+            "service": SERVICE_NAME,
+        }
+
+
+def current_span() -> Span | None:
+    """Return the active span, if any."""
+    return _current_span.get()
+
+
+def current_trace_id() -> str | None:
+    """Return the active trace id, if any."""
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+
+def start_span(
+    name: str,
+    parent: Span | None = None,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> Span:
+    """Start a span without making it current. Defaults the parent to the active span."""
+    return Span(name, parent=parent or _current_span.get(), kind=kind, attributes=attributes)
+
+
+@contextmanager
+def span(
+    name: str,
+    parent: Span | None = None,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> Generator[Span, None, None]:
+    """Run a block inside a new span that is current for its duration."""
+    new_span = start_span(name, parent=parent, kind=kind, attributes=attributes)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.record_exit(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end()
+
+
+# =============================================================================
+# EXPORTERS
+# =============================================================================
+
+class JsonlSpanExporter:
+    """Append finished spans to a JSONL file, one span per line."""
+
+    def __init__(self, path: str = TRACING_JSONL_PATH):
+        self.path = path
+
+    def export(self, spans: list[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for finished in spans:
+                f.write(json.dumps(finished.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OtlpHttpSpanExporter:
+    """Send finished spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT):
+        self.url = f"{endpoint}/v1/traces"
+
+    def _encode(self, finished: Span) -> dict:
+        encoded = {
+            "traceId": finished.trace_id,
+            "spanId": finished.span_id,
+            "name": finished.name,
+            "kind": finished.kind,
+            "startTimeUnixNano": str(finished.start_ns),
+            "endTimeUnixNano": str(finished.end_ns),
+            "attributes": _otlp_attributes(finished.attributes),
+            "events": [
+                {
+                    "timeUnixNano": str(event["time_ns"]),
+                    "name": event["name"],
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in finished.events
+            ],
+            "status": {
+                "code": self.STATUS_CODES[finished.status_code],
+                "message": finished.status_message,
+            },
+        }
+        if finished.parent_id:
+            encoded["parentSpanId"] = finished.parent_id
+        return encoded
+
+    def export(self, spans: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{
+                    "scope": {"name": "basedhoc"},
+                    "spans": [self._encode(finished) for finished in spans],
+                }],
+            }],
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them in batches from a daemon thread."""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=10_000)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def on_end(self, finished: Span) -> None:
+        if self.exporter is None:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            pass  # Drop spans rather than block request handling
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _drain(self, first: Span) -> list[Span]:
+        batch = [first]
+        while len(batch) < EXPORT_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=EXPORT_INTERVAL_SECONDS)
+            except queue.Empty:
+                continue
+            batch = self._drain(first)
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                print(f"WARNING: span export failed — {e}")
+
+
+def _create_exporter():
+    if TRACING_EXPORTER == "jsonl":
+        return JsonlSpanExporter()
+    if TRACING_EXPORTER == "otlp":
+        return OtlpHttpSpanExporter()
+    return None
+
+
+_processor = BatchSpanProcessor(_create_exporter())
+
+
+# =============================================================================
+# ASGI MIDDLEWARE
+# =============================================================================
+
+class TracingMiddleware:
+    """Open a server span per HTTP request and return its trace id in a header.
+
+    Implemented as plain ASGI (not BaseHTTPMiddleware) so the span stays open
+    until a streaming response body has been fully sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_span = start_span(
+            f"{scope['method']} {scope['path']}",
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        token = _current_span.set(request_span)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                request_span.set_attribute("http.status_code", message["status"])
+                request_span.add_event("response.start")
+                headers = list(message.get("headers", []))
+                headers.append((TRACE_ID_HEADER.lower().encode("latin-1"), request_span.trace_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            request_span.record_exit(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            request_span.end()
@@ -0,0 +1,159 @@
+"""Background warm-up and readiness state for the BasedHoc backend.
+
+On a cold start the app accepts requests as soon as it is imported; the
+MotherDuck connection check, schema catalog load and agent module imports run
+in a worker thread afterwards, and failed required steps are retried with
+backoff until they succeed or the app shuts down. /ready reports progress
+through WarmupState.
+"""
+
+import importlib
+import os
+import threading
+import time
+
+from db.database import test_connection
+from db.catalog import get_catalog
+from db.profiles import start_background_refresh
+
+# Set WARMUP_BLOCKING=1 to finish the first warm-up pass before the app starts serving
+WARMUP_BLOCKING = os.getenv("WARMUP_BLOCKING", "0") == "1"
+
+# Warm-up steps in run order; the app is ready once the required ones succeed
+WARMUP_STEPS = ["motherduck", "schema_catalog", "agent_modules"]
+READINESS_STEPS = ["motherduck", "schema_catalog"]
+
+# Backoff between retries of failed required steps
+RETRY_INITIAL_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+
+# Heavy modules preloaded after the warehouse steps so the first chat doesn't pay for them
+AGENT_MODULES = ["agent.agent"]
+
+
+class WarmupState:
+    """Thread-safe status of each warm-up step."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        # Set once every step has been tried at least once (WARMUP_BLOCKING waits on this)
+        self.first_pass_done = threading.Event()
+        # Set on shutdown to stop retrying
+        self.stopped = threading.Event()
+        self.steps: dict[str, dict] = {
+            name: {"status": "pending", "duration_ms": None, "error": None, "attempts": 0}
+            for name in WARMUP_STEPS
+        }
+
+    def run_step(self, name: str, func) -> bool:
+        """Run one warm-up step, recording its status and duration."""
+        with self._lock:
+            self.steps[name]["status"] = "running"
+            self.steps[name]["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            func()
+            status, error = "ok", None
+        except Exception as e:
+            status, error = "error", str(e)
+        with self._lock:
+            self.steps[name].update({
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": error,
+            })
+        return status == "ok"
+
+    def failed_required_steps(self) -> list[str]:
+        with self._lock:
+            return [name for name in READINESS_STEPS if self.steps[name]["status"] != "ok"]
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(self.steps[name]["status"] == "ok" for name in READINESS_STEPS)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ready": all(self.steps[name]["status"] == "ok" for name in READINESS_STEPS),
+                "warmup_complete": self.finished_at is not None,
+                "warmup_ms": (
+                    round((self.finished_at - self.started_at) * 1000, 1)
+                    if self.started_at and self.finished_at else None
+                ),
+                "steps": {name: dict(step) for name, step in self.steps.items()},
+            }
+
+
+warmup_state = WarmupState()
+
+
+def _check_motherduck() -> None:
+    if not test_connection():
+        raise RuntimeError("MotherDuck connection test returned unexpected result")
+
+
+def _load_schema_catalog() -> None:
+    catalog = get_catalog(force_refresh=True)
+    if not any(catalog.tables.values()):
+        raise RuntimeError("schema catalog is empty")
+
+
+def _import_agent_modules() -> None:
+    for module in AGENT_MODULES:
+        importlib.import_module(module)
+
+
+REQUIRED_STEP_FUNCS = {
+    "motherduck": _check_motherduck,
+    "schema_catalog": _load_schema_catalog,
+}
+
+
+def _run_required_steps(state: WarmupState) -> bool:
+    """Run the required steps that haven't succeeded yet, in order. Returns True when all pass."""
+    for name in state.failed_required_steps():
+        if not state.run_step(name, REQUIRED_STEP_FUNCS[name]):
+            return False
+        if name == "motherduck":
+            print("MotherDuck connection verified.")
+    return True
+
+
+def run_warmup(state: WarmupState = warmup_state) -> None:
+    """Run every warm-up step, retrying failed required steps until they succeed.
+
+    Blocks until the app is ready or state.stopped is set, so run it from a
+    worker thread.
+    """
+    state.started_at = time.perf_counter()
+
+    if not _run_required_steps(state):
+        print(f"WARNING: warm-up failed — {state.snapshot()['steps']}")
+        print("Set MOTHERDUCK_TOKEN in .env to connect. Retrying in the background.")
+
+    # Preloading the agent doesn't depend on the warehouse, so don't hold it behind retries
+    state.run_step("agent_modules", _import_agent_modules)
+
+    if start_background_refresh():
+        print("Table profile refresh started.")
+    state.first_pass_done.set()
+
+    delay = RETRY_INITIAL_SECONDS
+    while not _run_required_steps(state):
+        if state.stopped.wait(delay):
+            print("Warm-up stopped before the app became ready.")
+            return
+        delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+    state.finished_at = time.perf_counter()
+    print(f"Warm-up finished in {state.snapshot()['warmup_ms']} ms (ready={state.is_ready()}).")
+
+
+def start_warmup(state: WarmupState = warmup_state) -> threading.Thread:
+    """Run warm-up on a daemon thread so a warehouse outage can't hold up shutdown."""
+    thread = threading.Thread(target=run_warmup, args=(state,), name="warmup", daemon=True)
+    thread.start()
+    return thread
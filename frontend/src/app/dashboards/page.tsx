@@ -22,6 +22,9 @@ const CATEGORY_ORDER: ReportDefinition['category'][] = [
   'customer_success',
 ];
 
+// Time-series widgets refresh incrementally, so polling only moves the trailing rows
+const AUTO_REFRESH_INTERVAL_MS = 5 * 60 * 1000;
+
 function getDefaultParams(report: ReportDefinition): Record<string, unknown> {
   const defaults: Record<string, unknown> = {};
   for (const parameter of report.parameters) {
@@ -40,6 +43,7 @@ export default function DashboardsPage() {
 
   const [stateByReport, setStateByReport] = useState<Record<string, DashboardState>>({});
   const hasAutoLoaded = useRef(false);
+  const resultsRef = useRef<Record<string, ReportResult>>({});
 
   const runReport = async (report: ReportDefinition) => {
     setStateByReport((prev) => ({
@@ -48,12 +52,14 @@ export default function DashboardsPage() {
     }));
 
     try {
-      const result = await executeReport(report.id, getDefaultParams(report));
+      const result = await executeReport(report.id, getDefaultParams(report), resultsRef.current[report.id]);
+      resultsRef.current[report.id] = result;
       setStateByReport((prev) => ({
         ...prev,
         [report.id]: { isLoading: false, result, error: null },
       }));
     } catch (error) {
+      delete resultsRef.current[report.id];
       setStateByReport((prev) => ({
         ...prev,
         [report.id]: { isLoading: false, result: null, error: error instanceof Error ? error.message : 'Failed to load report' },
@@ -69,6 +75,15 @@ export default function DashboardsPage() {
     });
   }, [reports]);
 
+  useEffect(() => {
+    const interval = setInterval(() => {
+      reports.forEach((report) => {
+        runReport(report);
+      });
+    }, AUTO_REFRESH_INTERVAL_MS);
+    return () => clearInterval(interval);
+  }, [reports]);
+
   return (
     <div className="min-h-screen bg-surface-secondary">
       <Toolbar />
@@ -15,6 +15,12 @@ export interface ToolResult {
   result: unknown;
 }
 
+// Streamed `done` events reference results already sent in `tool_result` events
+export interface ToolResultRef {
+  tool: string;
+  result_ref: string;
+}
+
 export interface ChatResponse {
   message: string;
   conversation_id: string;
@@ -69,9 +75,11 @@ export interface StreamEvent {
   tool?: string;
   args?: Record<string, unknown>;
   result?: unknown;
+  result_ref?: string;
   tool_calls?: ToolCall[];
-  tool_results?: ToolResult[];
+  tool_results?: ToolResultRef[];
   error?: string;
+  trace_id?: string;
 }
 
 export async function* sendMessageStream(
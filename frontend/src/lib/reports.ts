@@ -26,6 +26,8 @@ export interface ReportDefinition {
     | 'tools';
   endpoint: string;
   parameters: ReportParameter[];
+  // Date-like column used for incremental refreshes of time-series reports
+  deltaKey?: string;
 }
 
 const DEFAULT_SQL_PARAM: ReportParameter = {
@@ -66,6 +68,7 @@ export const REPORTS: Record<string, ReportDefinition> = {
     description: 'Daily sessions, reliability, growth, and transfer metrics.',
     category: 'executive',
     endpoint: '/api/reports/query',
+    deltaKey: 'date',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -92,6 +95,7 @@ ORDER BY date;`,
     description: 'Total MRR, paying customers, and ARPU over time.',
     category: 'revenue',
     endpoint: '/api/reports/query',
+    deltaKey: 'as_of_date',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -135,6 +139,7 @@ ORDER BY mrr_usd DESC;`,
     description: 'Weekly cohort retention by weeks since signup.',
     category: 'growth',
     endpoint: '/api/reports/query',
+    deltaKey: 'cohort_week',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -156,6 +161,7 @@ ORDER BY cohort_week, week_n;`,
     description: 'Signup to activation and paying conversion by cohort week.',
     category: 'growth',
     endpoint: '/api/reports/query',
+    deltaKey: 'signup_week',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -254,6 +260,7 @@ LIMIT 100;`,
     description: 'Success, failures, errors, and latency trend.',
     category: 'engineering',
     endpoint: '/api/reports/query',
+    deltaKey: 'metric_date',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -277,6 +284,7 @@ ORDER BY metric_date;`,
     description: 'Proxy and stealth adoption with quality signals.',
     category: 'product',
     endpoint: '/api/reports/query',
+    deltaKey: 'metric_date',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -299,6 +307,7 @@ ORDER BY metric_date;`,
     description: 'Realized vs pending revenue and invoice collection by month.',
     category: 'revenue',
     endpoint: '/api/reports/query',
+    deltaKey: 'revenue_month',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -323,6 +332,7 @@ ORDER BY 1;`,
     description: 'Transfer volume, runtime, and infrastructure usage trends.',
     category: 'ops',
     endpoint: '/api/reports/query',
+    deltaKey: 'as_of_date',
     parameters: [
       {
         ...DEFAULT_SQL_PARAM,
@@ -367,11 +377,46 @@ export interface ReportResult {
   count?: number;
   summary?: Record<string, number>;
   schema?: Record<string, { name: string; type: string }[]>;
+  incremental?: boolean;
+  delta_key?: string;
+  fingerprint?: string;
+  high_water_mark?: string | null;
+  removed_keys?: string[];
+  total_row_count?: number;
+}
+
+// Apply an incremental result (changed rows + removed keys) to a cached result
+function mergeIncrementalResult(previous: ReportResult, delta: ReportResult, deltaKey: string): ReportResult {
+  const previousRows = previous.data || [];
+  const replaced = new Set([
+    ...(delta.data || []).map((row) => String(row[deltaKey])),
+    ...(delta.removed_keys || []),
+  ]);
+  const rows = [...previousRows.filter((row) => !replaced.has(String(row[deltaKey]))), ...(delta.data || [])];
+
+  // Keep the cached result's sort direction on the delta key
+  const firstKey = previousRows.length > 0 ? String(previousRows[0][deltaKey]) : '';
+  const lastKey = previousRows.length > 0 ? String(previousRows[previousRows.length - 1][deltaKey]) : '';
+  const descending = firstKey > lastKey;
+  rows.sort((a, b) => {
+    const left = String(a[deltaKey]);
+    const right = String(b[deltaKey]);
+    if (left === right) return 0;
+    return (left < right) === descending ? 1 : -1;
+  });
+
+  return {
+    ...delta,
+    data: rows,
+    columns: delta.columns && delta.columns.length > 0 ? delta.columns : previous.columns,
+    row_count: rows.length,
+  };
 }
 
 export async function executeReport(
   reportId: string,
-  params: Record<string, unknown>
+  params: Record<string, unknown>,
+  previous?: ReportResult | null
 ): Promise<ReportResult> {
   const report = REPORTS[reportId];
   if (!report) {
@@ -394,6 +439,13 @@ export async function executeReport(
         filteredParams[key] = value;
       }
     }
+    if (report.deltaKey) {
+      filteredParams.delta_key = report.deltaKey;
+      if (previous?.fingerprint && previous.high_water_mark && previous.delta_key === report.deltaKey) {
+        filteredParams.since = previous.high_water_mark;
+        filteredParams.fingerprint = previous.fingerprint;
+      }
+    }
     options.body = JSON.stringify(filteredParams);
   }
 
@@ -404,7 +456,11 @@ export async function executeReport(
     throw new Error(error.detail || 'Failed to execute report');
   }
 
-  return response.json();
+  const result: ReportResult = await response.json();
+  if (result.incremental && previous && report.deltaKey) {
+    return mergeIncrementalResult(previous, result, report.deltaKey);
+  }
+  return result;
 }
 
 export function validateParams(